@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-08-29 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_follow'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
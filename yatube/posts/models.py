@@ -1,10 +1,15 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from core.models import CreatedModel
 
 User = get_user_model()
 
+INDEX_PAGE_CACHE_KEY = 'index_page1'
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
@@ -45,6 +50,13 @@ class Post(CreatedModel):
         return self.text
 
 
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bust_index_page_cache(sender, **kwargs):
+    """Сбрасывает кэш первой страницы при изменении списка постов."""
+    cache.delete(INDEX_PAGE_CACHE_KEY)
+
+
 class Comment(CreatedModel):
     text = models.TextField(verbose_name='Текст комментария')
     post = models.ForeignKey(
@@ -72,3 +84,11 @@ class Follow(CreatedModel):
         related_name='following',
         verbose_name='Автор'
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow',
+            ),
+        ]
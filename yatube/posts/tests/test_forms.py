@@ -1,20 +1,30 @@
-import shutil
-import tempfile
-
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from posts.models import Group, Post, User
+from yatube.test_settings import MEDIA_ROOT as TEMP_MEDIA_ROOT
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
 
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+def make_uploaded(name='small.gif'):
+    """Свежий файл для загрузки: SimpleUploadedFile одноразовый."""
+    return SimpleUploadedFile(name, SMALL_GIF, 'image/gif')
 
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostFormTests(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
+        super().setUpTestData()
         cls.author = User.objects.create_user(username='author')
         cls.group = Group.objects.create(
             description='Описание тестовой группы',
@@ -26,36 +36,23 @@ class PostFormTests(TestCase):
             group=cls.group,
             text='Тестовый текст поста',
         )
+        login_client = Client()
+        login_client.force_login(cls.author)
+        cls.session_cookie = login_client.cookies[
+            settings.SESSION_COOKIE_NAME].value
 
     def setUp(self):
         self.guest_client = Client()
-        self.client.force_login(self.author)
-
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = (
+            self.session_cookie)
 
     def test_post_with_image(self):
         """При отправке поста с картинкой создаётся запись в БД."""
         post_count = Post.objects.count()
-        small_gif = (
-            b'\x47\x49\x46\x38\x39\x61\x02\x00'
-            b'\x01\x00\x80\x00\x00\x00\x00\x00'
-            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
-            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
-            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
-            b'\x0A\x00\x3B'
-        )
-        uploaded = SimpleUploadedFile(
-            name='small.gif',
-            content=small_gif,
-            content_type='image/gif',
-        )
         form_data = {
             'group': self.group.id,
             'text': 'Тестовый текст поста c картинкой',
-            'image': uploaded,
+            'image': make_uploaded(),
         }
         response = self.client.post(
             reverse('posts:post_create'),
@@ -119,6 +116,17 @@ class PostFormTests(TestCase):
         self.assertEqual(Post.objects.count(), post_count + 1)
         self.assertTrue(Post.objects.latest('id'))
 
+    def test_invalid_post_create_form_shows_errors(self):
+        """При невалидной форме создания поста рендерится связанная форма
+        с ошибками, а не пустая."""
+        post_count = Post.objects.count()
+        response = self.client.post(
+            reverse('posts:post_create'),
+            data={'text': '', 'group': self.group.id},
+        )
+        self.assertEqual(Post.objects.count(), post_count)
+        self.assertTrue(response.context['form'].errors)
+
     def test_anonymous_create_post(self):
         """Не авторизованный пользователь не может создать пост"""
         post_count = Post.objects.count()
@@ -1,5 +1,3 @@
-import shutil
-import tempfile
 from http import HTTPStatus
 
 from django import forms
@@ -8,16 +6,31 @@ from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
-from posts.models import Comment, Follow, Group, Post, User
+from posts.models import (INDEX_PAGE_CACHE_KEY, Comment, Follow, Group, Post,
+                          User)
+from posts.views import POSTS_PER_PAGE
+from yatube.test_settings import MEDIA_ROOT as TEMP_MEDIA_ROOT
 
-TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def make_uploaded(name='small.gif'):
+    """Свежий файл для загрузки: SimpleUploadedFile одноразовый."""
+    return SimpleUploadedFile(name, SMALL_GIF, 'image/gif')
 
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostViewTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
+        super().setUpTestData()
         cls.author = User.objects.create(username='author')
         cls.user = User.objects.create_user(username='test_user')
         cls.group = Group.objects.create(
@@ -30,82 +43,86 @@ class PostViewTest(TestCase):
             text='Текст тестового поста.',
             group=cls.group,
         )
-        cls.small_gif = (
-            b'\x47\x49\x46\x38\x39\x61\x02\x00'
-            b'\x01\x00\x80\x00\x00\x00\x00\x00'
-            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
-            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
-            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
-            b'\x0A\x00\x3B'
-        )
-        cls.uploaded = SimpleUploadedFile(
-            name='small.gif',
-            content=cls.small_gif,
-            content_type='image/gif',
-        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group_list': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': cls.user}),
+            'post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.id}),
+            'post_edit': reverse(
+                'posts:post_edit', kwargs={'post_id': cls.post.id}),
+            'post_create': reverse('posts:post_create'),
+            'follow_index': reverse('posts:follow_index'),
+            'add_comment': reverse('posts:add_comment', args=(cls.post.id,)),
+            'author_profile': reverse(
+                'posts:profile', args=(cls.author,)),
+            'profile_follow': reverse(
+                'posts:profile_follow', args=(cls.author,)),
+            'profile_unfollow': reverse(
+                'posts:profile_unfollow', args=(cls.author,)),
+        }
+        cls.templates_page_names = {
+            cls.urls['index']: 'posts/index.html',
+            cls.urls['group_list']: 'posts/group_list.html',
+            cls.urls['profile']: 'posts/profile.html',
+            cls.urls['post_detail']: 'posts/post_detail.html',
+            cls.urls['post_edit']: 'posts/create_post.html',
+            cls.urls['post_create']: 'posts/create_post.html',
+            cls.urls['follow_index']: 'posts/follow.html',
+        }
+        login_client = Client()
+        login_client.force_login(cls.user)
+        cls.session_cookie = login_client.cookies[
+            settings.SESSION_COOKIE_NAME].value
 
     def setUp(self):
         self.guest_client = Client()
-        self.client.force_login(self.user)
-        cache.clear()
-
-    @classmethod
-    def tearDownClass(cls):
-        super().tearDownClass()
-        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = (
+            self.session_cookie)
+        # Кэш первой страницы хранит посты, откатываемые между тестами, —
+        # сбрасываем его, чтобы тесты не зависели от порядка запуска.
+        cache.delete(INDEX_PAGE_CACHE_KEY)
 
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
-        templates_page_names = {
-            reverse('posts:index'): 'posts/index.html',
-            reverse('posts:group_list', kwargs={'slug': self.group.slug}):
-                'posts/group_list.html',
-            reverse('posts:profile', kwargs={'username': self.user}):
-                'posts/profile.html',
-            reverse('posts:post_detail', kwargs={'post_id': self.post.id}):
-                'posts/post_detail.html',
-            reverse('posts:post_edit', kwargs={'post_id': self.post.id}):
-                'posts/create_post.html',
-            reverse('posts:post_create'): 'posts/create_post.html',
-            reverse('posts:follow_index'): 'posts/follow.html',
-        }
-        for reverse_name, template in templates_page_names.items():
+        for reverse_name, template in self.templates_page_names.items():
             with self.subTest(template=template):
                 response = self.client.get(reverse_name)
                 self.assertTemplateUsed(response, template)
 
     def test_index_show_correct_context(self):
         """Список постов страницы index."""
-        response = self.client.get(reverse('posts:index'))
+        cache.clear()
+        self.addCleanup(cache.clear)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.urls['index'])
         self.assertEqual(response.context['page_obj'][0], self.post)
 
     def test_group_list_show_correct_context(self):
         """Список постов отфильтрованных по группе."""
-        response = self.client.get(
-            reverse('posts:group_list', kwargs={'slug': self.group.slug})
-        )
+        response = self.client.get(self.urls['group_list'])
         self.assertEqual(response.context['page_obj'][0], self.post)
         self.assertEqual(response.context['group'], self.group)
 
     def test_profile_show_correct_context(self):
         """Список постов отфильтрованных по пользователю."""
-        response = self.client.get(
-            reverse('posts:profile', kwargs={'username': self.user}))
+        with self.assertNumQueries(6):
+            response = self.client.get(self.urls['profile'])
         self.assertEqual(response.context['page_obj'][0], self.post)
         self.assertEqual(response.context['author'], self.user)
 
     def test_post_detail_show_correct_context(self):
         """Один пост, отфильтрованный по id."""
-        response = self.client.get(
-            reverse('posts:post_detail', kwargs={'post_id': self.post.id}))
+        response = self.client.get(self.urls['post_detail'])
         self.assertEqual(response.context['one_post'], self.post)
 
     def test_post_create_and_edit_show_correct_context(self):
         """Форма создания/редактирования поста, отфильтрованного по id."""
         views = [
-            self.client.get(reverse('posts:post_create')),
-            self.client.get(
-                reverse('posts:post_edit', kwargs={'post_id': self.post.id}))
+            self.client.get(self.urls['post_create']),
+            self.client.get(self.urls['post_edit']),
         ]
         for response in views:
             form_fields = {
@@ -149,28 +166,28 @@ class PostViewTest(TestCase):
         """Проверяем, что при выводе поста с картинкой изображение передаётся
         в context на главную, групп, профиля страниц."""
         views = (
-            reverse('posts:index'),
-            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
-            reverse('posts:profile', kwargs={'username': self.user}),
+            self.urls['index'],
+            self.urls['group_list'],
+            self.urls['profile'],
         )
         form_data = {
             'group': self.group.id,
             'text': 'Тестовый текст поста c картинкой',
-            'image': self.uploaded,
+            'image': make_uploaded(),
             'author': self.user,
         }
         self.client.post(
-            reverse('posts:post_create'),
+            self.urls['post_create'],
             data=form_data,
             follow=True,
         )
+        created_post = Post.objects.latest('id')
         for view in views:
             with self.subTest(view=view):
-                new_post = Post.objects.latest('id').image.name
                 response = self.client.get(view)
                 first_object = response.context['page_obj'][0]
-                post_image = first_object.image.name
-                self.assertEqual(post_image, new_post)
+                self.assertEqual(
+                    first_object.image.name, created_post.image.name)
 
     def test_image_post_detail(self):
         """Проверяем, что при выводе поста с картинкой изображение передаётся
@@ -178,25 +195,23 @@ class PostViewTest(TestCase):
         form_data = {
             'group': self.group.id,
             'text': 'Тестовый текст поста c картинкой',
-            'image': self.uploaded,
+            'image': make_uploaded(),
             'author': self.user,
         }
         self.client.post(
-            reverse('posts:post_create'),
+            self.urls['post_create'],
             data=form_data,
             follow=True,
         )
-        response = self.client.get(
-            reverse('posts:post_detail', kwargs={'post_id': self.post.id}))
+        response = self.client.get(self.urls['post_detail'])
         first_object = response.context['one_post']
         self.assertIsNotNone(first_object.image)
 
     def test_guest_cant_comment(self):
         """Гости не могут комментить посты."""
         comment_data = {'text': 'тестовый коммент'}
-        reverse_name = reverse('posts:add_comment', args=(self.post.id,))
         self.guest_client.post(
-            reverse_name,
+            self.urls['add_comment'],
             data=comment_data,
             follow=True,
         )
@@ -206,16 +221,18 @@ class PostViewTest(TestCase):
         """После отправки комментарий появляется на странице поста."""
         comment_data = {'text': 'тестовый коммент'}
         self.client.post(
-            reverse('posts:add_comment', args=(self.post.id,)),
+            self.urls['add_comment'],
             data=comment_data,
             follow=True,
         )
-        comment = Comment.objects.first()
+        comment = Comment.objects.filter(post=self.post).only('text').get()
         self.assertIn(comment_data['text'], comment.text)
 
     def test_index_caches(self):
         """Тест кэша главной страницы"""
-        response = self.client.get(reverse('posts:index'))
+        cache.clear()
+        self.addCleanup(cache.clear)
+        response = self.client.get(self.urls['index'])
         new_post = Post.objects.create(
             author=self.user,
             text='Пост проверки кеша.',
@@ -223,25 +240,21 @@ class PostViewTest(TestCase):
         )
         self.assertNotIn(new_post, response.context['page_obj'])
         cache.clear()
-        response_2 = self.client.get(reverse('posts:index'))
+        response_2 = self.client.get(self.urls['index'])
         self.assertIn(new_post, response_2.context['page_obj'])
 
     def test_users_can_follow_and_unfollow(self):
         """Зарегистрированный юзер может подписаться и отписаться."""
         follower_qty = Follow.objects.count()
-        response = self.client.get(
-            reverse('posts:profile_follow', args=(self.author,))
-        )
+        response = self.client.get(self.urls['profile_follow'])
         self.assertRedirects(
-            response, reverse('posts:profile', args=(self.author,)),
+            response, self.urls['author_profile'],
             HTTPStatus.FOUND
         )
         self.assertEqual(Follow.objects.count(), follower_qty + 1)
-        response = self.client.get(
-            reverse('posts:profile_unfollow', args=(self.author,))
-        )
+        response = self.client.get(self.urls['profile_unfollow'])
         self.assertRedirects(
-            response, reverse('posts:profile', args=(self.author,)),
+            response, self.urls['author_profile'],
             HTTPStatus.FOUND
         )
         self.assertEqual(Follow.objects.count(), follower_qty)
@@ -257,24 +270,21 @@ class PostViewTest(TestCase):
             user=self.user,
             author=self.author
         )
-        response = self.client.get(
-            reverse('posts:follow_index')
-        )
+        with self.assertNumQueries(4):
+            response = self.client.get(self.urls['follow_index'])
         self.assertContains(response, self.post)
         Follow.objects.filter(
             user=self.user,
             author__username=self.author.username
         ).delete()
-        response = self.client.get(
-            reverse('posts:follow_index')
-        )
+        response = self.client.get(self.urls['follow_index'])
         self.assertNotContains(response, self.post)
 
 
 class PaginatorTest(TestCase):
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
+    def setUpTestData(cls):
+        super().setUpTestData()
         cls.author = User.objects.create_user(username='test-user-0')
         cls.group = Group.objects.create(
             title='Test-group', slug='test-slug',
@@ -286,36 +296,35 @@ class PaginatorTest(TestCase):
                 group=cls.group,
                 text=f'Test-text-{i}'
             ) for i in range(13)
-            ])
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
         cls.CONST = {
-            'RECORD_ON_PAGE': 10,
+            'RECORD_ON_PAGE': POSTS_PER_PAGE,
             'LEFT_RECORDS': 3,
         }
-
-    def test_paginator(self):
-        """Проверяем 10 записей на 1-ой странице и остаток на 2-ой"""
-
-        def test_page_contains_ten_records(route):
-            response = self.client.get(route)
-            self.assertEqual(
-                len(response.context['page_obj']), self.CONST['RECORD_ON_PAGE']
-            )
-
-        def test_page_contains_three_records(route):
-            response = self.client.get(route + '?page=2')
-            self.assertEqual(
-                len(response.context['page_obj']), self.CONST['LEFT_RECORDS']
-            )
-
-        routes = {
+        cls.routes = {
             'index': reverse('posts:index'),
             'group_list': reverse(
-                'posts:group_list', kwargs={'slug': self.group.slug}
+                'posts:group_list', kwargs={'slug': cls.group.slug}
             ),
             'profile': reverse(
-                'posts:profile', kwargs={'username': self.author}
+                'posts:profile', kwargs={'username': cls.author}
             ),
         }
-        for route in routes:
-            test_page_contains_ten_records(routes[route])
-            test_page_contains_three_records(routes[route])
+
+    def test_paginator(self):
+        """Проверяем 10 записей на 1-ой странице и остаток на 2-ой"""
+        cache.clear()
+        pages = (
+            (1, self.CONST['RECORD_ON_PAGE']),
+            (2, self.CONST['LEFT_RECORDS']),
+        )
+        for name, route in self.routes.items():
+            for page, expected in pages:
+                with self.subTest(route=name, page=page):
+                    response = self.client.get(route, {'page': page})
+                    self.assertEqual(
+                        len(response.context['page_obj']), expected
+                    )
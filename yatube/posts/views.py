@@ -1,17 +1,38 @@
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
+from .models import INDEX_PAGE_CACHE_KEY, Follow, Group, Post, User
+
+POSTS_PER_PAGE = 10
+
+
+def _paginate(request, queryset):
+    """Страница паджинатора для текущего запроса."""
+    paginator = Paginator(queryset, POSTS_PER_PAGE)
+    return paginator.get_page(request.GET.get('page'))
 
 
 def index(request):
     """Главная страница с записями."""
-    posts_list = Post.objects.all()
-    paginator = Paginator(posts_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts_list = Post.objects.select_related('author', 'group').only(
+        'text', 'pub_date', 'image',
+        'author__username', 'author__first_name', 'author__last_name',
+        'group__slug',
+    )
+    if request.GET.get('page') in (None, '1'):
+        page_obj = cache.get(INDEX_PAGE_CACHE_KEY)
+        if page_obj is None:
+            page_obj = _paginate(request, posts_list)
+            page_obj.object_list = list(page_obj.object_list)
+            # Паджинатор уже вычислил count; не даём pickle вытянуть
+            # весь queryset при записи страницы в кэш.
+            page_obj.paginator.object_list = page_obj.object_list
+            cache.set(INDEX_PAGE_CACHE_KEY, page_obj, 20)
+    else:
+        page_obj = _paginate(request, posts_list)
     context = {
         'page_obj': page_obj,
     }
@@ -21,13 +42,13 @@ def index(request):
 def group_posts(request, slug):
     """Страница сообщества."""
     group = get_object_or_404(Group, slug=slug)
-    posts_list = group.posts.all()
-    paginator = Paginator(posts_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts_list = group.posts.select_related('author').only(
+        'text', 'pub_date', 'image',
+        'author__username', 'author__first_name', 'author__last_name',
+    )
     context = {
         'group': group,
-        'page_obj': page_obj,
+        'page_obj': _paginate(request, posts_list),
     }
     return render(request, 'posts/group_list.html', context)
 
@@ -36,16 +57,11 @@ def profile(request, username):
     """Страница профиля."""
     author = get_object_or_404(User, username=username)
     post_list = author.posts.select_related('group')
-    count = post_list.count()
-    following = Follow.objects.filter(user=request.user.id, author=author)
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author).exists()
     context = {
-        'count': count,
         'author': author,
-        'post_list': post_list,
-        'page_obj': page_obj,
+        'page_obj': _paginate(request, post_list),
         'following': following,
     }
     return render(request, 'posts/profile.html', context)
@@ -53,9 +69,10 @@ def profile(request, username):
 
 def post_detail(request, post_id):
     """Страница поста."""
-    one_post = get_object_or_404(Post, pk=post_id)
+    one_post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id)
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.filter(post=post_id)
+    comments = one_post.comments.select_related('author')
     context = {
         'one_post': one_post,
         'form': form,
@@ -116,12 +133,14 @@ def add_comment(request, post_id):
 def follow_index(request):
     """Страница с подписками."""
     posts_list = Post.objects.select_related('author', 'group').filter(
-        author__following__user=request.user)
-    paginator = Paginator(posts_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        author__following__user=request.user,
+    ).only(
+        'text', 'pub_date', 'image',
+        'author__username', 'author__first_name', 'author__last_name',
+        'group__slug',
+    )
     context = {
-        'page_obj': page_obj,
+        'page_obj': _paginate(request, posts_list),
     }
     return render(request, 'posts/follow.html', context)
 
@@ -131,8 +150,11 @@ def profile_follow(request, username):
     """Подписка на автора."""
     following = get_object_or_404(User, username=username)
     follower = request.user
-    if follower != following and follower != following.follower:
-        Follow.objects.get_or_create(user=follower, author=following)
+    if follower.id != following.id:
+        Follow.objects.bulk_create(
+            [Follow(user=follower, author=following)],
+            ignore_conflicts=True,
+        )
     return redirect('posts:profile', username)
 
 
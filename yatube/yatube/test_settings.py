@@ -0,0 +1,19 @@
+"""Настройки для запуска тестов.
+
+Медиа-файлы пишутся во временный каталог, который удаляется по
+завершении процесса; каталог получает префикс воркера pytest-xdist,
+чтобы параллельные запуски не пересекались.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+MEDIA_ROOT = tempfile.mkdtemp(
+    prefix=os.environ.get('PYTEST_XDIST_WORKER', ''),
+    dir=BASE_DIR,
+)
+atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)